@@ -1,25 +1,194 @@
 #!/usr/bin/env python3
 import argparse
+import concurrent.futures
+import gzip
+import hashlib
 import json
 import os
+import re
 import sqlite3
 import subprocess
+import tempfile
+import threading
+import time
 import urllib.parse
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+# Shared pool for fanning out independent subprocess calls; module-level so
+# threads are created once, not per request.
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+
+# Hard ceiling on journal lines per request; an unbounded dump can reach
+# many MB and freeze both the server and the browser.
+MAX_JOURNAL_LINES = 5000
+
+# Fixed queries as module-level constants: passing the same string object
+# each call keeps sqlite3's internal statement cache hot, skipping re-prepare.
+SQL_GET_SERVICES = "SELECT service_name FROM tracked_services ORDER BY service_name"
+SQL_ADD_SERVICE = "INSERT INTO tracked_services (service_name) VALUES (?)"
+SQL_ADD_SERVICE_IGNORE = (
+    "INSERT OR IGNORE INTO tracked_services (service_name) VALUES (?)"
+)
+SQL_REMOVE_SERVICE = "DELETE FROM tracked_services WHERE service_name = ?"
+SQL_GET_TOGGLE = (
+    "SELECT is_expanded FROM service_toggles WHERE service_name = ? AND toggle_type = ?"
+)
+SQL_SET_TOGGLE = """
+    INSERT OR REPLACE INTO service_toggles (service_name, toggle_type, is_expanded, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+"""
+SQL_GET_ALL_TOGGLES = (
+    "SELECT service_name, toggle_type, is_expanded FROM service_toggles"
+)
+
+# Virtual/pseudo filesystems to skip when reporting disk usage.
+_PSEUDO_FSTYPES = {
+    "autofs",
+    "binfmt_misc",
+    "bpf",
+    "cgroup",
+    "cgroup2",
+    "configfs",
+    "debugfs",
+    "devpts",
+    "devtmpfs",
+    "efivarfs",
+    "fusectl",
+    "hugetlbfs",
+    "mqueue",
+    "nsfs",
+    "overlay",
+    "proc",
+    "pstore",
+    "ramfs",
+    "rpc_pipefs",
+    "securityfs",
+    "squashfs",
+    "sysfs",
+    "tmpfs",
+    "tracefs",
+}
+
+# Optional: orjson is 2-5x faster than stdlib json on the large log/journal
+# payloads and emits bytes directly, skipping the extra .encode().
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(data):
+        return orjson.dumps(data)
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(data):
+        return json.dumps(data).encode()
+
+
+# Optional: query systemd over D-Bus instead of forking systemctl.
+# The dashboard stays standard-library only; pystemd is used when present.
+try:
+    from pystemd.dbuslib import DBus as _SystemdDBus
+    from pystemd.systemd1 import Unit as _SystemdUnit
+except ImportError:
+    _SystemdDBus = None
+    _SystemdUnit = None
+
+
+def _as_str(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+_BYTE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+def _format_bytes(bytes_val):
+    # Each unit spans 10 bits, so bit_length picks it in O(1) instead of
+    # dividing through the unit list.
+    unit_idx = min(
+        max(int(bytes_val).bit_length() - 1, 0) // 10, len(_BYTE_UNITS) - 1
+    )
+    return f"{bytes_val / (1 << (unit_idx * 10)):.1f}{_BYTE_UNITS[unit_idx]}"
+
+
+def _default_service_info(name, state="unknown", status=""):
+    return {
+        "name": name,
+        "status": status,
+        "active": state == "active",
+        "state": state,
+        "memory": "N/A",
+        "uptime": "N/A",
+        "main_pid": "N/A",
+        "load_state": "N/A",
+        "unit_file_state": "N/A",
+    }
+
+
+# The template never changes at runtime; read, gzip and hash it once instead
+# of hitting the filesystem on every GET /.
+_TEMPLATE_PATH = Path(__file__).parent / "templates" / "index.html"
+_template_cache = None
+
+
+def _load_template():
+    global _template_cache
+    if _template_cache is None:
+        body = _TEMPLATE_PATH.read_bytes()
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=8).hexdigest()
+        _template_cache = (body, gzip.compress(body, compresslevel=6), etag)
+    return _template_cache
+
 
 class SystemdDashboard:
+    # Dashboards poll every few seconds, often from several tabs; statuses
+    # fresher than this are served from memory instead of re-querying systemd.
+    STATUS_TTL = 2.0
+
     def __init__(self, db_path="services.db"):
         self.db_path = db_path
-        self.init_db()
-
-    def init_db(self):
         db_dir = os.path.dirname(self.db_path)
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Single long-lived connection shared by all requests; opening a
+        # connection per query pays for file open + schema parse every time.
+        self._conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256,
+        )
+        # Single local writer: WAL + relaxed fsync keeps toggle writes cheap
+        # and lets concurrent reads proceed while a write is in flight.
+        self._conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=134217728;
+            PRAGMA cache_size=-8000;
+        """)
+        self._lock = threading.Lock()
+        # One D-Bus connection for the process lifetime, plus loaded pystemd
+        # Unit proxies keyed by service name, so repeated polls skip both the
+        # auth handshake and the introspection/load round trip. sd-bus is not
+        # thread safe, so all D-Bus traffic goes through _dbus_lock.
+        self._dbus = None
+        self._dbus_lock = threading.Lock()
+        self._dbus_units = {}
+        # service name -> (monotonic timestamp, status dict)
+        self._status_cache = {}
+        self.init_db()
+
+    def init_db(self):
+        cursor = self._conn.cursor()
+        # The connection is in autocommit mode; group the DDL into one
+        # explicit transaction so setup commits (and fsyncs) once.
+        cursor.execute("BEGIN IMMEDIATE")
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS tracked_services (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -37,64 +206,131 @@ class SystemdDashboard:
                 UNIQUE(service_name, toggle_type)
             )
         """)
-        conn.commit()
-        conn.close()
+        # Covering index: the UNIQUE constraint indexes (service_name,
+        # toggle_type) but lookups still hit the table for is_expanded.
+        # Including it lets toggle reads be answered from the index alone.
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_toggles_svc_type
+            ON service_toggles(service_name, toggle_type, is_expanded)
+        """)
+        cursor.execute("COMMIT")
 
     def get_tracked_services(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT service_name FROM tracked_services ORDER BY service_name"
-        )
-        services = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return services
+        with self._lock:
+            cursor = self._conn.execute(SQL_GET_SERVICES)
+            return [row[0] for row in cursor.fetchall()]
 
     def add_service(self, service_name):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         try:
-            cursor.execute(
-                "INSERT INTO tracked_services (service_name) VALUES (?)",
-                (service_name,),
-            )
-            conn.commit()
-            conn.close()
+            with self._lock:
+                self._conn.execute(SQL_ADD_SERVICE, (service_name,))
             return True
         except sqlite3.IntegrityError:
-            conn.close()
             return False
 
+    def bulk_add_services(self, service_names):
+        # One transaction + executemany: per-row commits would fsync once per
+        # service when importing a list.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    SQL_ADD_SERVICE_IGNORE, [(name,) for name in service_names]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
     def remove_service(self, service_name):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "DELETE FROM tracked_services WHERE service_name = ?", (service_name,)
-        )
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(SQL_REMOVE_SERVICE, (service_name,))
 
     def get_service_status(self, service_name):
-        try:
-            result = subprocess.run(
-                ["systemctl", "status", service_name],
-                capture_output=True,
-                text=True,
-                timeout=5,
+        return self.get_services_status([service_name])[0]
+
+    def _dbus_service_status(self, service_name):
+        if self._dbus is None:
+            self._dbus = _SystemdDBus()
+            self._dbus.open()
+
+        unit = self._dbus_units.get(service_name)
+        if unit is None:
+            unit = _SystemdUnit(service_name.encode(), bus=self._dbus)
+            unit.load()
+            self._dbus_units[service_name] = unit
+
+        state = _as_str(unit.Unit.ActiveState)
+        service_info = _default_service_info(service_name, state)
+        service_info["load_state"] = _as_str(unit.Unit.LoadState)
+        service_info["unit_file_state"] = _as_str(unit.Unit.UnitFileState) or "N/A"
+
+        main_pid = unit.Service.MainPID
+        if main_pid:
+            service_info["main_pid"] = str(main_pid)
+
+        # MemoryCurrent is UINT64_MAX when accounting is off ("[not set]").
+        memory = unit.Service.MemoryCurrent
+        if memory and memory < 2**63:
+            service_info["memory"] = _format_bytes(memory)
+
+        # Realtime timestamp in microseconds; 0 when never activated.
+        active_enter = unit.Unit.ActiveEnterTimestamp
+        if active_enter:
+            service_info["uptime"] = self._format_duration(
+                time.time() - active_enter / 1e6
             )
 
-            is_active = subprocess.run(
-                ["systemctl", "is-active", service_name],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
+        return service_info
 
-            show_result = subprocess.run(
+    def get_services_status(self, service_names):
+        if not service_names:
+            return []
+
+        now = time.monotonic()
+        statuses = {}
+        stale = []
+        for name in service_names:
+            entry = self._status_cache.get(name)
+            if entry is not None and now - entry[0] < self.STATUS_TTL:
+                statuses[name] = entry[1]
+            else:
+                stale.append(name)
+
+        if stale:
+            for service_info in self._fetch_services_status(stale):
+                self._status_cache[service_info["name"]] = (now, service_info)
+                statuses[service_info["name"]] = service_info
+
+        return [statuses[name] for name in service_names]
+
+    def _fetch_services_status(self, service_names):
+        if _SystemdUnit is not None:
+            with self._dbus_lock:
+                try:
+                    return [
+                        self._dbus_service_status(name) for name in service_names
+                    ]
+                except Exception:
+                    # D-Bus unavailable (container, permissions); tear down
+                    # while still holding the lock so no other thread is
+                    # mid-read on the bus we close, then shell out instead.
+                    self._dbus_units.clear()
+                    if self._dbus is not None:
+                        try:
+                            self._dbus.close()
+                        except Exception:
+                            pass
+                        self._dbus = None
+
+        try:
+            # The two systemctl calls are independent; run them in parallel.
+            show_future = _EXECUTOR.submit(
+                subprocess.run,
                 [
                     "systemctl",
                     "show",
-                    service_name,
+                    *service_names,
                     "--property=MainPID,MemoryCurrent,CPUUsageNSec,ActiveEnterTimestamp,LoadState,UnitFileState",
                 ],
                 capture_output=True,
@@ -102,20 +338,34 @@ class SystemdDashboard:
                 timeout=5,
             )
 
-            service_info = {
-                "name": service_name,
-                "status": result.stdout,
-                "active": is_active.stdout.strip() == "active",
-                "state": is_active.stdout.strip(),
-                "memory": "N/A",
-                "uptime": "N/A",
-                "main_pid": "N/A",
-                "load_state": "N/A",
-                "unit_file_state": "N/A",
-            }
+            # Prints one state per line in argv order; exit code is nonzero
+            # when any unit is inactive, so ignore returncode here.
+            is_active_future = _EXECUTOR.submit(
+                subprocess.run,
+                ["systemctl", "is-active", *service_names],
+                capture_output=True,
+                text=True,
+                timeout=5,
+            )
+
+            show_result = show_future.result()
+            is_active = is_active_future.result()
+
+            states = is_active.stdout.splitlines()
+            # `systemctl show` separates units with a blank line.
+            blocks = (
+                show_result.stdout.strip().split("\n\n")
+                if show_result.returncode == 0
+                else []
+            )
+
+            results = []
+            for i, service_name in enumerate(service_names):
+                state = states[i].strip() if i < len(states) else "unknown"
+                service_info = _default_service_info(service_name, state)
 
-            if show_result.returncode == 0:
-                for line in show_result.stdout.strip().split("\n"):
+                block = blocks[i] if i < len(blocks) else ""
+                for line in block.split("\n"):
                     if "=" in line:
                         key, value = line.split("=", 1)
                         if (
@@ -125,7 +375,7 @@ class SystemdDashboard:
                         ):
                             memory_bytes = int(value)
                             if memory_bytes > 0:
-                                service_info["memory"] = self._format_bytes(
+                                service_info["memory"] = _format_bytes(
                                     memory_bytes
                                 )
                         elif key == "MainPID" and value != "0":
@@ -137,74 +387,59 @@ class SystemdDashboard:
                         elif key == "UnitFileState":
                             service_info["unit_file_state"] = value
 
-            return service_info
+                results.append(service_info)
+
+            return results
         except subprocess.TimeoutExpired:
-            return {
-                "name": service_name,
-                "status": "Timeout",
-                "active": False,
-                "state": "unknown",
-                "memory": "N/A",
-                "uptime": "N/A",
-                "main_pid": "N/A",
-                "load_state": "N/A",
-                "unit_file_state": "N/A",
-            }
+            return [
+                _default_service_info(service_name, status="Timeout")
+                for service_name in service_names
+            ]
         except Exception as e:
-            return {
-                "name": service_name,
-                "status": f"Error: {e!s}",
-                "active": False,
-                "state": "error",
-                "memory": "N/A",
-                "uptime": "N/A",
-                "main_pid": "N/A",
-                "load_state": "N/A",
-                "unit_file_state": "N/A",
-            }
-
-    def _format_bytes(self, bytes_val):
-        for unit in ["B", "KB", "MB", "GB"]:
-            if bytes_val < 1024.0:
-                return f"{bytes_val:.1f}{unit}"
-            bytes_val /= 1024.0
-        return f"{bytes_val:.1f}TB"
+            return [
+                _default_service_info(service_name, "error", f"Error: {e!s}")
+                for service_name in service_names
+            ]
 
     def _calculate_uptime(self, timestamp_str):
-        try:
-            if not timestamp_str or timestamp_str in ["", "n/a"]:
-                return "N/A"
-
-            import re
-            from datetime import datetime
-
-            timestamp_match = re.search(
-                r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})", timestamp_str
-            )
-            if not timestamp_match:
-                return "N/A"
+        if not timestamp_str or timestamp_str == "n/a":
+            return "N/A"
 
-            start_time = datetime.strptime(
-                timestamp_match.group(1), "%Y-%m-%d %H:%M:%S"
-            )
-            uptime_seconds = (datetime.now() - start_time).total_seconds()
-
-            if uptime_seconds < 60:
-                return f"{int(uptime_seconds)}s"
-            elif uptime_seconds < 3600:
-                return f"{int(uptime_seconds // 60)}m"
-            elif uptime_seconds < 86400:
-                hours = int(uptime_seconds // 3600)
-                minutes = int((uptime_seconds % 3600) // 60)
-                return f"{hours}h {minutes}m"
+        # systemd prints "Day YYYY-MM-DD HH:MM:SS TZ"; pick out the date and
+        # time fields and let the C-implemented fromisoformat parse them.
+        try:
+            parts = timestamp_str.split()
+            if "-" in parts[0]:
+                date_str, time_str = parts[0], parts[1]
             else:
-                days = int(uptime_seconds // 86400)
-                hours = int((uptime_seconds % 86400) // 3600)
-                return f"{days}d {hours}h"
-        except Exception:
+                date_str, time_str = parts[1], parts[2]
+            start_time = datetime.fromisoformat(f"{date_str} {time_str}")
+            return self._format_duration(time.time() - start_time.timestamp())
+        except (IndexError, ValueError):
             return "N/A"
 
+    def _format_duration(self, uptime_seconds):
+        if uptime_seconds < 60:
+            return f"{int(uptime_seconds)}s"
+        elif uptime_seconds < 3600:
+            return f"{int(uptime_seconds // 60)}m"
+        elif uptime_seconds < 86400:
+            hours = int(uptime_seconds // 3600)
+            minutes = int((uptime_seconds % 3600) // 60)
+            return f"{hours}h {minutes}m"
+        else:
+            days = int(uptime_seconds // 86400)
+            hours = int((uptime_seconds % 86400) // 3600)
+            return f"{days}d {hours}h"
+
     def control_service(self, service_name, action):
+        try:
+            return self._run_control(service_name, action)
+        finally:
+            # Drop the cached status so the post-action refresh is instant.
+            self._status_cache.pop(service_name, None)
+
+    def _run_control(self, service_name, action):
         # Try without sudo first (for containers/systems running as root)
         try:
             result = subprocess.run(
@@ -249,60 +484,68 @@ class SystemdDashboard:
 
     def get_service_logs(self, service_name, lines=50):
         try:
-            result = subprocess.run(
+            return self._stream_journal(
                 ["journalctl", "-u", service_name, "-n", str(lines), "--no-pager", "-o", "json"],
-                capture_output=True,
-                text=True,
                 timeout=10,
             )
-            if result.returncode != 0:
-                return result.stderr or "Error getting logs"
-            
-            json_logs = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    try:
-                        log_entry = json.loads(line)
-                        json_logs.append(log_entry)
-                    except json.JSONDecodeError:
-                        continue
-            
-            return json_logs
         except Exception as e:
             return f"Error getting logs: {e!s}"
 
+    def _stream_journal(self, args, timeout, what="logs"):
+        # journalctl already emits one JSON object per line; collect the raw
+        # bytes and assemble a JSON array without ever parsing the entries —
+        # the browser is the only consumer.
+        #
+        # stderr goes to a temp file rather than a pipe: nothing drains it
+        # while stdout is being streamed, so a chatty journalctl could fill
+        # the pipe buffer and deadlock. The kill timer enforces the deadline
+        # even if journalctl wedges mid-stream (reading to EOF alone never
+        # times out).
+        with tempfile.TemporaryFile() as stderr_file:
+            proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=stderr_file)
+            timed_out = threading.Event()
+
+            def _kill():
+                timed_out.set()
+                proc.kill()
+
+            killer = threading.Timer(timeout, _kill)
+            killer.start()
+            entries = []
+            try:
+                for line in proc.stdout:
+                    line = line.strip()
+                    if line:
+                        entries.append(line)
+            finally:
+                killer.cancel()
+                proc.wait()
+
+            if timed_out.is_set():
+                return f"Error getting {what}: timed out"
+            if proc.returncode != 0:
+                stderr_file.seek(0)
+                return stderr_file.read().decode() or f"Error getting {what}"
+        return b"[" + b",".join(entries) + b"]"
+
     def get_toggle_state(self, service_name, toggle_type="logs"):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT is_expanded FROM service_toggles WHERE service_name = ? AND toggle_type = ?",
-            (service_name, toggle_type),
-        )
-        result = cursor.fetchone()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.execute(
+                SQL_GET_TOGGLE, (service_name, toggle_type)
+            )
+            result = cursor.fetchone()
         return result[0] if result else False
 
     def set_toggle_state(self, service_name, toggle_type, is_expanded):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            """
-            INSERT OR REPLACE INTO service_toggles (service_name, toggle_type, is_expanded, updated_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-        """,
-            (service_name, toggle_type, is_expanded),
-        )
-        conn.commit()
-        conn.close()
+        with self._lock:
+            self._conn.execute(
+                SQL_SET_TOGGLE, (service_name, toggle_type, is_expanded)
+            )
 
     def get_all_toggle_states(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT service_name, toggle_type, is_expanded FROM service_toggles"
-        )
-        results = cursor.fetchall()
-        conn.close()
+        with self._lock:
+            cursor = self._conn.execute(SQL_GET_ALL_TOGGLES)
+            results = cursor.fetchall()
 
         toggle_states = {}
         for service_name, toggle_type, is_expanded in results:
@@ -314,90 +557,59 @@ class SystemdDashboard:
 
     def get_disk_usage(self):
         try:
-            result = subprocess.run(
-                ["df", "-h"], capture_output=True, text=True, timeout=10
-            )
-            if result.returncode != 0:
-                return {"error": "Failed to get disk usage"}
-
-            lines = result.stdout.strip().split("\n")
-            if len(lines) < 2:
-                return {"error": "Invalid df output"}
-
-            lines[0].split()
             disk_usage = []
+            seen = set()
+            with open("/proc/mounts", "r") as f:
+                mounts = f.readlines()
 
-            for line in lines[1:]:
+            for line in mounts:
                 parts = line.split()
-                if len(parts) >= 6:
-                    filesystem = parts[0]
-                    size = parts[1]
-                    used = parts[2]
-                    available = parts[3]
-                    use_percent = parts[4].rstrip("%")
-                    mounted_on = " ".join(parts[5:])
-
-                    try:
-                        use_percent_num = (
-                            int(use_percent) if use_percent.isdigit() else 0
-                        )
-                    except (ValueError, TypeError):
-                        use_percent_num = 0
-
-                    disk_usage.append(
-                        {
-                            "filesystem": filesystem,
-                            "size": size,
-                            "used": used,
-                            "available": available,
-                            "use_percent": use_percent,
-                            "use_percent_num": use_percent_num,
-                            "mounted_on": mounted_on,
-                        }
-                    )
+                if len(parts) < 3:
+                    continue
+                filesystem, mountpoint, fstype = parts[0], parts[1], parts[2]
+                if fstype in _PSEUDO_FSTYPES or filesystem in seen:
+                    continue
+                # /proc/mounts octal-escapes whitespace in mountpoints
+                mountpoint = mountpoint.replace("\\040", " ").replace("\\011", "\t")
+
+                try:
+                    st = os.statvfs(mountpoint)
+                except OSError:
+                    continue
+
+                size = st.f_blocks * st.f_frsize
+                if size == 0:
+                    continue
+                seen.add(filesystem)
+
+                used = (st.f_blocks - st.f_bfree) * st.f_frsize
+                available = st.f_bavail * st.f_frsize
+                total_usable = used + available
+                use_percent_num = (
+                    int(used / total_usable * 100) if total_usable > 0 else 0
+                )
+
+                disk_usage.append(
+                    {
+                        "filesystem": filesystem,
+                        "size": _format_bytes(size),
+                        "used": _format_bytes(used),
+                        "available": _format_bytes(available),
+                        "use_percent": str(use_percent_num),
+                        "use_percent_num": use_percent_num,
+                        "mounted_on": mountpoint,
+                    }
+                )
 
             disk_usage.sort(key=lambda x: x["use_percent_num"], reverse=True)
             return {"disks": disk_usage}
 
-        except subprocess.TimeoutExpired:
-            return {"error": "Disk usage check timed out"}
         except Exception as e:
             return {"error": f"Error getting disk usage: {e!s}"}
 
     def get_ram_usage(self):
-        try:
-            result = subprocess.run(
-                ["free", "-h"], capture_output=True, text=True, timeout=10
-            )
-            if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
-                if len(lines) >= 2:
-                    mem_line = lines[1].split()
-                    if len(mem_line) >= 7:
-                        total = mem_line[1]
-                        used = mem_line[2]
-                        free = mem_line[3]
-                        available = mem_line[6]
-
-                        try:
-                            total_kb = self._parse_memory_value(total)
-                            used_kb = self._parse_memory_value(used)
-                            use_percent = int((used_kb / total_kb) * 100) if total_kb > 0 else 0
-                        except (ValueError, ZeroDivisionError):
-                            use_percent = 0
-
-                        return {
-                            "total": total,
-                            "used": used,
-                            "free": free,
-                            "available": available,
-                            "use_percent": use_percent,
-                        }
-
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.SubprocessError):
-            pass
-
-        # Fallback to /proc/meminfo if free command fails or is not available
+        # /proc/meminfo is where `free` gets its numbers anyway; reading it
+        # directly skips the fork and the lossy human-size round trip.
         try:
             with open('/proc/meminfo', 'r') as f:
                 meminfo = f.read()
@@ -417,10 +629,10 @@ class SystemdDashboard:
                 free_bytes = mem_data.get('MemFree', 0)
                 used_bytes = total_bytes - available_bytes
 
-                total_formatted = self._format_bytes(total_bytes)
-                used_formatted = self._format_bytes(used_bytes)
-                free_formatted = self._format_bytes(free_bytes)
-                available_formatted = self._format_bytes(available_bytes)
+                total_formatted = _format_bytes(total_bytes)
+                used_formatted = _format_bytes(used_bytes)
+                free_formatted = _format_bytes(free_bytes)
+                available_formatted = _format_bytes(available_bytes)
 
                 use_percent = int((used_bytes / total_bytes) * 100) if total_bytes > 0 else 0
 
@@ -439,174 +651,139 @@ class SystemdDashboard:
         
         return {"error": "Unable to determine RAM usage"}
 
-    def _parse_memory_value(self, value):
-        if value.endswith('T'):
-            return float(value[:-1]) * 1024 * 1024 * 1024
-        elif value.endswith('G'):
-            return float(value[:-1]) * 1024 * 1024
-        elif value.endswith('M'):
-            return float(value[:-1]) * 1024
-        elif value.endswith('K'):
-            return float(value[:-1])
-        else:
-            return float(value) / 1024
-
-    def _format_memory_kb(self, kb_value):
-        if kb_value >= 1024 * 1024 * 1024:
-            return f"{kb_value / (1024 * 1024 * 1024):.1f}T"
-        elif kb_value >= 1024 * 1024:
-            return f"{kb_value / (1024 * 1024):.1f}G"
-        elif kb_value >= 1024:
-            return f"{kb_value / 1024:.1f}M"
-        else:
-            return f"{kb_value:.1f}K"
-
-    def get_full_journal(self, service_name):
+    def get_full_journal(self, service_name, lines=500, since=None):
+        args = ["journalctl", "-u", service_name, "-n", str(lines), "--no-pager", "-o", "json"]
+        if since:
+            args.append(f"--since={since}")
         try:
-            result = subprocess.run(
-                ["journalctl", "-u", service_name, "--no-pager", "-o", "json"],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            if result.returncode != 0:
-                return result.stderr or "Error getting journal"
-            
-            json_logs = []
-            for line in result.stdout.strip().split('\n'):
-                if line.strip():
-                    try:
-                        log_entry = json.loads(line)
-                        json_logs.append(log_entry)
-                    except json.JSONDecodeError:
-                        continue
-            
-            return json_logs
+            return self._stream_journal(args, timeout=30, what="journal")
         except Exception as e:
             return f"Error getting journal: {e!s}"
 
 
+# Route table compiled once at import; handlers receive the regex groups
+# (plus the decoded body for POST) instead of re-splitting the path per branch.
+ROUTES = {
+    "GET": (
+        (re.compile(r"^/$"), "_serve_template"),
+        (re.compile(r"^/api/services$"), "_handle_get_services"),
+        (re.compile(r"^/api/services/([^/]+)/logs$"), "_handle_get_logs"),
+        (re.compile(r"^/api/services/([^/]+)/journal$"), "_handle_get_journal"),
+        (re.compile(r"^/api/toggle-states$"), "_handle_get_toggle_states"),
+        (re.compile(r"^/api/disk-usage$"), "_handle_get_disk_usage"),
+        (re.compile(r"^/api/ram-usage$"), "_handle_get_ram_usage"),
+    ),
+    "POST": (
+        (re.compile(r"^/api/services$"), "_handle_add_service"),
+        (re.compile(r"^/api/services/remove$"), "_handle_remove_service"),
+        (re.compile(r"^/api/services/([^/]+)/control$"), "_handle_control_service"),
+        (re.compile(r"^/api/services/([^/]+)/toggle$"), "_handle_set_toggle_state"),
+    ),
+    "DELETE": (
+        (re.compile(r"^/api/services/([^/]+)$"), "_handle_remove_service_by_name"),
+    ),
+}
+
+
 class DashboardRequestHandler(BaseHTTPRequestHandler):
     def __init__(self, *args, dashboard_instance=None, base_url="/", **kwargs):
         self.dashboard = dashboard_instance
         self.base_url = base_url.rstrip('/')
+        self._base_len = len(self.base_url)
         super().__init__(*args, **kwargs)
 
     def log_message(self, format, *args):
         pass
 
-    def do_GET(self):
-        parsed_path = urllib.parse.urlparse(self.path)
+    def _dispatch(self, method, *extra):
+        # urlsplit skips the params field urlparse computes; parse_qsl keeps
+        # scalar values instead of allocating a list per key.
+        parsed_path = urllib.parse.urlsplit(self.path)
         path = parsed_path.path
-        query_params = urllib.parse.parse_qs(parsed_path.query)
 
         # Strip base_url from path if present
-        if self.base_url and path.startswith(self.base_url):
-            path = path[len(self.base_url):] or "/"
-
-        if path == "/":
-            self._serve_template()
-        elif path == "/api/services":
-            self._handle_get_services()
-        elif path.startswith("/api/services/") and path.endswith("/logs"):
-            service_name = path.split("/")[3]
-            lines = int(query_params.get("lines", ["50"])[0])
-            self._handle_get_logs(service_name, lines)
-        elif path.startswith("/api/services/") and path.endswith("/journal"):
-            service_name = path.split("/")[3]
-            self._handle_get_journal(service_name)
-        elif path == "/api/toggle-states":
-            self._handle_get_toggle_states()
-        elif path == "/api/disk-usage":
-            self._handle_get_disk_usage()
-        elif path == "/api/ram-usage":
-            self._handle_get_ram_usage()
-        else:
-            self._send_error(404, "Not Found")
+        if self._base_len and path.startswith(self.base_url):
+            path = path[self._base_len:] or "/"
 
-    def do_POST(self):
-        parsed_path = urllib.parse.urlparse(self.path)
-        path = parsed_path.path
+        self.query_params = dict(urllib.parse.parse_qsl(parsed_path.query))
 
-        # Strip base_url from path if present
-        if self.base_url and path.startswith(self.base_url):
-            path = path[len(self.base_url):] or "/"
+        for pattern, handler_name in ROUTES[method]:
+            match = pattern.match(path)
+            if match:
+                getattr(self, handler_name)(*match.groups(), *extra)
+                return
+        self._send_error(404, "Not Found")
 
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
         content_length = int(self.headers.get("Content-Length", 0))
         post_data = self.rfile.read(content_length).decode("utf-8")
 
         try:
-            data = json.loads(post_data) if post_data else {}
-        except json.JSONDecodeError:
+            data = _json_loads(post_data) if post_data else {}
+        except ValueError:
             self._send_error(400, "Invalid JSON")
             return
 
-        if path == "/api/services":
-            self._handle_add_service(data)
-        elif path == "/api/services/remove":
-            self._handle_remove_service(data)
-        elif path.startswith("/api/services/") and path.endswith("/control"):
-            service_name = path.split("/")[3]
-            self._handle_control_service(service_name, data)
-        elif path.startswith("/api/services/") and path.endswith("/toggle"):
-            service_name = path.split("/")[3]
-            self._handle_set_toggle_state(service_name, data)
-        else:
-            self._send_error(404, "Not Found")
+        self._dispatch("POST", data)
 
     def do_DELETE(self):
-        parsed_path = urllib.parse.urlparse(self.path)
-        path = parsed_path.path
-
-        # Strip base_url from path if present
-        if self.base_url and path.startswith(self.base_url):
-            path = path[len(self.base_url):] or "/"
-
-        if path.startswith("/api/services/") and len(path.split("/")) == 4:
-            service_name = path.split("/")[3]
-            self._handle_remove_service_by_name(service_name)
-        else:
-            self._send_error(404, "Not Found")
+        self._dispatch("DELETE")
 
     def _send_cors_headers(self):
         self.send_header("Access-Control-Allow-Origin", "*")
         self.send_header("Access-Control-Allow-Methods", "GET, POST, DELETE, OPTIONS")
         self.send_header("Access-Control-Allow-Headers", "Content-Type")
 
-    def _send_json_response(self, data, status=200):
+    def _send_body(self, body, content_type, status=200):
         self.send_response(status)
-        self.send_header("Content-type", "application/json")
+        self.send_header("Content-type", content_type)
+        # Compress anything non-trivial; level 1 keeps CPU cost negligible
+        # while log/journal payloads shrink 5-10x.
+        if len(body) > 1024 and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
         self._send_cors_headers()
         self.end_headers()
-        self.wfile.write(json.dumps(data).encode())
+        self.wfile.write(body)
+
+    def _send_json_response(self, data, status=200):
+        self._send_body(_json_dumps(data), "application/json", status)
 
     def _send_error(self, code, message):
-        self.send_response(code)
-        self.send_header("Content-type", "application/json")
-        self._send_cors_headers()
-        self.end_headers()
-        self.wfile.write(json.dumps({"error": message}).encode())
+        self._send_body(_json_dumps({"error": message}), "application/json", code)
 
     def _serve_template(self):
-        template_path = Path(__file__).parent / "templates" / "index.html"
         try:
-            with open(template_path, "r") as f:
-                content = f.read()
+            body, body_gzip, etag = _load_template()
+        except FileNotFoundError:
+            self._send_error(404, "Template not found")
+            return
 
-            self.send_response(200)
-            self.send_header("Content-type", "text/html")
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
             self._send_cors_headers()
             self.end_headers()
-            self.wfile.write(content.encode())
-        except FileNotFoundError:
-            self._send_error(404, "Template not found")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-type", "text/html")
+        self.send_header("ETag", etag)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = body_gzip
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self._send_cors_headers()
+        self.end_headers()
+        self.wfile.write(body)
 
     def _handle_get_services(self):
         services = self.dashboard.get_tracked_services()
-        service_data = []
-        for service in services:
-            status = self.dashboard.get_service_status(service)
-            service_data.append(status)
+        service_data = self.dashboard.get_services_status(services)
         self._send_json_response(service_data)
 
     def _handle_add_service(self, data):
@@ -649,13 +826,45 @@ class DashboardRequestHandler(BaseHTTPRequestHandler):
         result = self.dashboard.control_service(service_name, action)
         self._send_json_response(result)
 
-    def _handle_get_logs(self, service_name, lines):
+    def _handle_get_logs(self, service_name):
+        try:
+            lines = int(self.query_params.get("lines", "50"))
+        except ValueError:
+            self._send_error(400, "Invalid lines parameter")
+            return
+        if not 1 <= lines <= MAX_JOURNAL_LINES:
+            self._send_error(
+                400, f"lines must be between 1 and {MAX_JOURNAL_LINES}"
+            )
+            return
+
         logs = self.dashboard.get_service_logs(service_name, lines)
-        self._send_json_response({"logs": logs})
+        self._send_journal_response("logs", logs)
 
     def _handle_get_journal(self, service_name):
-        journal = self.dashboard.get_full_journal(service_name)
-        self._send_json_response({"journal": journal})
+        try:
+            lines = int(self.query_params.get("lines", "500"))
+        except ValueError:
+            self._send_error(400, "Invalid lines parameter")
+            return
+        if not 1 <= lines <= MAX_JOURNAL_LINES:
+            self._send_error(
+                400, f"lines must be between 1 and {MAX_JOURNAL_LINES}"
+            )
+            return
+
+        since = self.query_params.get("since")
+        journal = self.dashboard.get_full_journal(service_name, lines, since)
+        self._send_journal_response("journal", journal)
+
+    def _send_journal_response(self, key, payload):
+        # Pre-assembled JSON array bytes pass straight through; error strings
+        # still take the normal serialization path.
+        if isinstance(payload, bytes):
+            body = b'{"' + key.encode() + b'":' + payload + b"}"
+            self._send_body(body, "application/json")
+        else:
+            self._send_json_response({key: payload})
 
     def _handle_set_toggle_state(self, service_name, data):
         toggle_type = data.get("toggle_type", "logs")
@@ -704,7 +913,9 @@ if __name__ == "__main__":
     dashboard = SystemdDashboard(db_path)
 
     handler_class = create_handler(dashboard, args.base_url)
-    httpd = HTTPServer((args.host, args.port), handler_class)
+    # Threaded server: a slow journalctl call in one request no longer
+    # stalls every other polling client.
+    httpd = ThreadingHTTPServer((args.host, args.port), handler_class)
 
     print(f"Starting server on {args.host}:{args.port}")
     try: